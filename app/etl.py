@@ -1,10 +1,24 @@
+import argparse
+import csv
+import logging
 import os
+import queue
+import random
+import shutil
+import subprocess
+import threading
 import time
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import psycopg2
 from neo4j import GraphDatabase
+from neo4j.exceptions import ServiceUnavailable, SessionExpired, TransientError
 import pandas as pd
 
+log = logging.getLogger(__name__)
+
 # Environment variables
 POSTGRES_HOST = os.getenv("POSTGRES_HOST", "localhost")
 POSTGRES_USER = os.getenv("POSTGRES_USER", "app")
@@ -15,10 +29,61 @@ NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
 NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "password")
 
+# DEBUG adds per-statement and per-batch progress lines
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# The API caches read-heavy responses; the ETL asks it to drop them when done.
+API_URL = os.getenv("API_URL", "http://localhost:8000")
+
+# Where --cold writes its neo4j-admin CSVs; docker-compose mounts the repo's
+# neo4j/import here and into the Neo4j container as /var/lib/neo4j/import.
+NEO4J_IMPORT_DIR = Path(
+    os.getenv("NEO4J_IMPORT_DIR", Path(__file__).resolve().parent.parent / "neo4j" / "import")
+)
+
+# Client-side writer threads for the fact tables. 1 disables the pool and
+# leaves the parallelism to CALL { ... } IN CONCURRENT TRANSACTIONS instead.
+ETL_WRITERS = int(os.getenv("ETL_WRITERS", "8"))
+
+# Rows per write transaction, per table. Wide node rows do best around
+# 1k-2k; narrow relationship rows tolerate 5k and more.
+CATEGORIES_BATCH = int(os.getenv("CATEGORIES_BATCH", "500"))
+PRODUCTS_BATCH = int(os.getenv("PRODUCTS_BATCH", "2000"))
+CUSTOMERS_BATCH = int(os.getenv("CUSTOMERS_BATCH", "1000"))
+ORDERS_BATCH = int(os.getenv("ORDERS_BATCH", "2000"))
+ORDER_ITEMS_BATCH = int(os.getenv("ORDER_ITEMS_BATCH", "5000"))
+EVENTS_BATCH = int(os.getenv("EVENTS_BATCH", "5000"))
+
+# Fact tables are fetched FETCH_BATCHES write batches at a time, so each fetch
+# gives the writer pool or the concurrent server-side transactions enough work.
+FETCH_BATCHES = 8
+
+
+def backoff_delay(attempt, base=0.5, cap=30):
+    """Exponential backoff with full jitter: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_transient(fn, attempts=5):
+    """Call fn(), retrying transient Neo4j failures with jittered backoff.
 
-def wait_for_postgres(max_retries=30, delay=2):
+    Only for auto-commit work: managed transactions (execute_write) already
+    retry internally.
+    """
+    for attempt in range(attempts):
+        try:
+            return fn()
+        except (TransientError, ServiceUnavailable, SessionExpired) as e:
+            if attempt == attempts - 1:
+                raise
+            delay = backoff_delay(attempt, base=0.1, cap=10)
+            log.warning("Transient Neo4j error, retrying in %.2fs: %s", delay, e)
+            time.sleep(delay)
+
+
+def wait_for_postgres(max_retries=30):
     """Wait for PostgreSQL to be ready."""
-    print("Waiting for PostgreSQL...")
+    log.info("Waiting for PostgreSQL...")
     for i in range(max_retries):
         try:
             conn = psycopg2.connect(
@@ -28,57 +93,122 @@ def wait_for_postgres(max_retries=30, delay=2):
                 dbname=POSTGRES_DB
             )
             conn.close()
-            print("✓ PostgreSQL is ready")
+            log.info("✓ PostgreSQL is ready")
             return
         except psycopg2.OperationalError:
             if i < max_retries - 1:
-                time.sleep(delay)
+                time.sleep(backoff_delay(i))
             else:
                 raise Exception("PostgreSQL not ready after maximum retries")
 
 
-def wait_for_neo4j(max_retries=30, delay=2):
+def wait_for_neo4j(max_retries=30):
     """Wait for Neo4j to be ready."""
-    print("Waiting for Neo4j...")
-    for i in range(max_retries):
-        try:
-            driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-            with driver.session() as session:
-                session.run("RETURN 1")
-            driver.close()
-            print("✓ Neo4j is ready")
-            return
-        except Exception as e:
-            if i < max_retries - 1:
-                time.sleep(delay)
-            else:
-                raise Exception(f"Neo4j not ready after maximum retries: {e}")
+    log.info("Waiting for Neo4j...")
+    # One driver for all attempts; verify_connectivity only does the Bolt
+    # handshake, without opening a session or running a query.
+    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    try:
+        for i in range(max_retries):
+            try:
+                driver.verify_connectivity()
+                log.info("✓ Neo4j is ready")
+                return
+            except Exception as e:
+                if i < max_retries - 1:
+                    time.sleep(backoff_delay(i))
+                else:
+                    raise Exception(f"Neo4j not ready after maximum retries: {e}")
+    finally:
+        driver.close()
+
+
+# Applied before any load even if queries.cypher is missing, so every MERGE
+# and MATCH on id is an index seek rather than a label scan.
+SCHEMA_CONSTRAINTS = [
+    "CREATE CONSTRAINT customer_id IF NOT EXISTS FOR (c:Customer) REQUIRE c.id IS UNIQUE",
+    "CREATE CONSTRAINT product_id IF NOT EXISTS FOR (p:Product) REQUIRE p.id IS UNIQUE",
+    "CREATE CONSTRAINT order_id IF NOT EXISTS FOR (o:Order) REQUIRE o.id IS UNIQUE",
+    "CREATE CONSTRAINT category_id IF NOT EXISTS FOR (cat:Category) REQUIRE cat.id IS UNIQUE",
+]
 
 
 def run_cypher(driver, query, parameters=None):
-    """Execute a single Cypher query."""
+    """Execute a single Cypher query in its own session (schema bootstrap only)."""
     with driver.session() as session:
         result = session.run(query, parameters or {})
         return result.consume()
 
 
-def run_cypher_file(driver, filepath):
+def write_batch(tx, rows, *queries):
+    """Run each UNWIND query over the same batch inside one managed transaction."""
+    for query in queries:
+        tx.run(query, rows=rows).consume()
+
+
+def split_cypher_statements(content):
+    """Split a Cypher script into statements.
+
+    A semicolon ends a statement only outside string literals, backquoted
+    names and comments, so multi-line strings (e.g. apoc.periodic.iterate
+    inner queries) stay intact and `...; // comment` still splits. // and
+    /* */ comments are dropped.
+    """
+    statements, current = [], []
+    quote = None
+    i = 0
+    while i < len(content):
+        ch = content[i]
+        if quote:
+            current.append(ch)
+            if ch == '\\' and quote != '`' and i + 1 < len(content):
+                # Keep the escaped character, even if it is the quote itself
+                current.append(content[i + 1])
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch in '\'"`':
+            quote = ch
+            current.append(ch)
+        elif content.startswith('//', i):
+            end = content.find('\n', i)
+            i = len(content) if end == -1 else end
+            continue
+        elif content.startswith('/*', i):
+            end = content.find('*/', i + 2)
+            i = len(content) if end == -1 else end + 2
+            continue
+        elif ch == ';':
+            statements.append(''.join(current))
+            current = []
+        else:
+            current.append(ch)
+        i += 1
+    statements.append(''.join(current))
+    return [stmt.strip() for stmt in statements if stmt.strip()]
+
+
+def run_cypher_file(session, filepath):
     """Execute multiple Cypher statements from a file."""
-    print(f"Running Cypher file: {filepath}")
+    log.info("Running Cypher file: %s", filepath)
     with open(filepath, 'r') as f:
         content = f.read()
     
-    # Split by semicolons and filter empty statements
-    statements = [stmt.strip() for stmt in content.split(';') if stmt.strip()]
-    
-    for stmt in statements:
-        if stmt:
-            try:
-                run_cypher(driver, stmt)
-                print(f"✓ Executed: {stmt[:50]}...")
-            except Exception as e:
-                print(f"✗ Error executing statement: {e}")
-                print(f"  Statement: {stmt[:100]}")
+    for stmt in split_cypher_statements(content):
+        try:
+            session.run(stmt).consume()
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("✓ Executed: %s...", stmt[:50])
+        except Exception as e:
+            log.error("✗ Error executing statement: %s", e)
+            log.error("  Statement: %s", stmt[:100])
+
+
+def create_constraints(driver):
+    """Create the id uniqueness constraints the loaders rely on."""
+    for stmt in SCHEMA_CONSTRAINTS:
+        run_cypher(driver, stmt)
+    log.info("✓ Ensured %d uniqueness constraints", len(SCHEMA_CONSTRAINTS))
 
 
 def chunk(df, chunk_size=100):
@@ -87,16 +217,446 @@ def chunk(df, chunk_size=100):
         yield df[i:i + chunk_size]
 
 
-def etl():
+def stream_rows(pg_conn, name, query, batch_size=2000):
+    """Yield batches of rows as dicts from a server-side (named) cursor."""
+    with pg_conn.cursor(name=name) as cur:
+        cur.itersize = batch_size
+        cur.execute(query)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            columns = [col.name for col in cur.description]
+            yield [dict(zip(columns, row)) for row in rows]
+
+
+EVENT_TYPE_MAP = {
+    'view': 'VIEWED',
+    'click': 'CLICKED',
+    'add_to_cart': 'ADDED_TO_CART'
+}
+
+
+def load_categories(session, categories_df):
+    """Load Category nodes."""
+    query = """
+    UNWIND $rows AS row
+    MERGE (cat:Category {id: row.id})
+    SET cat.name = row.name
+    """
+    for part in chunk(categories_df, CATEGORIES_BATCH):
+        session.execute_write(write_batch, part.to_dict('records'), query)
+
+
+def load_products(session, products_df):
+    """Load Product nodes and their IN_CATEGORY relationships."""
+    # Nodes first, then relationships, so both passes are plain index lookups
+    # on the Product/Category id constraints from queries.cypher.
+    product_query = """
+    UNWIND $rows AS r
+    MERGE (p:Product {id: r.id})
+    SET p.name = r.name, p.price = r.price
+    """
+    in_category_query = """
+    UNWIND $rows AS r
+    MATCH (p:Product {id: r.id}), (cat:Category {id: r.category_id})
+    MERGE (p)-[:IN_CATEGORY]->(cat)
+    """
+    products = products_df.assign(price=products_df['price'].astype('float64'))
+    for part in chunk(products, PRODUCTS_BATCH):
+        session.execute_write(
+            write_batch, part.to_dict('records'), product_query, in_category_query
+        )
+
+
+def load_customers(session, customers_df):
+    """Load Customer nodes."""
+    query = """
+    UNWIND $rows AS r
+    MERGE (c:Customer {id: r.id})
+    SET c.name = r.name, c.join_date = date(r.join_date)
+    """
+    customers = customers_df.assign(
+        join_date=pd.to_datetime(customers_df['join_date']).dt.strftime('%Y-%m-%d')
+    )
+    for part in chunk(customers, CUSTOMERS_BATCH):
+        session.execute_write(write_batch, part.to_dict('records'), query)
+
+
+def load_orders(session, orders_df):
+    """Load Order nodes and the PLACED relationships from their customers."""
+    order_query = """
+    UNWIND $rows AS r
+    MERGE (o:Order {id: r.id})
+    SET o.ts = datetime(r.ts)
+    """
+    placed_query = """
+    UNWIND $rows AS r
+    MATCH (c:Customer {id: r.customer_id}), (o:Order {id: r.id})
+    MERGE (c)-[:PLACED]->(o)
+    """
+    # Convert timestamp to ISO format (UTC) for the whole column at once
+    orders = orders_df.assign(
+        ts=pd.to_datetime(orders_df['ts'], utc=True).dt.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+    )
+    for part in chunk(orders, ORDERS_BATCH):
+        session.execute_write(write_batch, part.to_dict('records'), order_query, placed_query)
+
+
+def write_shard(driver, rows, query, batch_size):
+    """Write one shard of rows from a pool thread, in that thread's own session."""
+    with driver.session() as session:
+        for i in range(0, len(rows), batch_size):
+            session.execute_write(write_batch, rows[i:i + batch_size], query)
+
+
+def write_fact_rows(session, writers, rows, shard_key, inner_query, batch_size):
+    """Write a batch of fact rows through `inner_query`, which reads each row as `r`.
+
+    Without a writer pool the batch is sent once and Neo4j splits it with
+    CALL { ... } IN CONCURRENT TRANSACTIONS of `batch_size` rows, which needs
+    an auto-commit transaction. With a pool, rows are hash-partitioned on
+    `shard_key` (Product end nodes are still shared between shards) and each
+    shard, sorted by product_id, is written in parallel by its own session, in
+    transactions of `batch_size` rows; execute_write retries transient errors
+    such as deadlocks with jittered backoff.
+    """
+    if writers is None:
+        query = f"""
+        UNWIND $rows AS r
+        CALL {{
+            WITH r
+            {inner_query}
+        }} IN CONCURRENT TRANSACTIONS OF $batch_size ROWS
+        """
+        # A failure here can leave earlier inner transactions committed, so
+        # the retried batch relies on inner_query being idempotent (MERGE).
+        retry_transient(
+            lambda: session.run(query, rows=rows, batch_size=batch_size).consume()
+        )
+        return
+
+    driver, executor = writers
+    shards = [[] for _ in range(ETL_WRITERS)]
+    for row in rows:
+        # A NULL foreign key can never MATCH, so skip the row as the
+        # server-side path does instead of sharding or sorting on None.
+        if row[shard_key] is None or row['product_id'] is None:
+            continue
+        shards[hash(row[shard_key]) % ETL_WRITERS].append(row)
+    # Shards keep shard_key nodes (orders, customers) apart between workers, but
+    # every shard still writes onto the shared Product end nodes. Sorting each
+    # shard by product_id makes all workers take those locks in the same order,
+    # which avoids most deadlocks; the rest are left to execute_write's retry.
+    for shard in shards:
+        shard.sort(key=lambda row: row['product_id'])
+    query = f"UNWIND $rows AS r\n{inner_query}"
+    # Wait for every shard before returning, so shards running at the same time
+    # always come from one batch.
+    futures = [
+        executor.submit(write_shard, driver, shard, query, batch_size)
+        for shard in shards if shard
+    ]
+    for future in futures:
+        future.result()
+
+
+def load_order_items(session, rows, writers=None):
+    """Load CONTAINS relationships between orders and products."""
+    inner_query = """
+    MATCH (o:Order {id: r.order_id}), (p:Product {id: r.product_id})
+    MERGE (o)-[c:CONTAINS]->(p)
+    SET c.quantity = r.quantity
+    """
+    write_fact_rows(session, writers, rows, 'order_id', inner_query, ORDER_ITEMS_BATCH)
+
+
+def load_events(session, rows, writers=None):
+    """Load customer-product interaction relationships, one type per event_type."""
+    # Relationship types cannot be parameterized, so send one batch per type.
+    # Grouping on the mapped type keeps one fixed query text per relationship
+    # type, planned once instead of per row. rel_type always comes from
+    # EVENT_TYPE_MAP, never from the data itself.
+    rows_by_rel_type = defaultdict(list)
+    for row in rows:
+        rows_by_rel_type[EVENT_TYPE_MAP.get(row['event_type'], 'INTERACTED')].append(row)
+
+    # ts arrives from psycopg2 as a timezone-aware datetime, which the driver
+    # sends as a native Neo4j DateTime.
+    for rel_type, rel_rows in rows_by_rel_type.items():
+        inner_query = f"""
+        MATCH (c:Customer {{id: r.customer_id}}), (p:Product {{id: r.product_id}})
+        MERGE (c)-[x:{rel_type} {{event_id: r.id}}]->(p)
+        SET x.ts = r.ts
+        """
+        write_fact_rows(
+            session, writers, rel_rows, 'customer_id', inner_query, EVENTS_BATCH
+        )
+
+
+def invalidate_api_cache():
+    """Ask the API to drop its cached responses now that the graph has changed."""
+    request = urllib.request.Request(f"{API_URL}/cache/invalidate", method="POST")
+    try:
+        urllib.request.urlopen(request, timeout=5).close()
+        log.info("✓ Invalidated API cache")
+    except OSError as e:
+        log.warning("Could not invalidate API cache at %s: %s", API_URL, e)
+
+
+def extract_batches(pg_conn):
+    """Yield (table, batch) pairs from PostgreSQL in the order they must be loaded."""
+    # Dimension tables are small and come whole as DataFrames; order_items and
+    # events are streamed from server-side cursors so they are never held in
+    # memory all at once.
+    for table in ('categories', 'products', 'customers', 'orders'):
+        yield table, pd.read_sql(f"SELECT * FROM {table}", pg_conn)
+    for rows in stream_rows(
+        pg_conn, 'order_items_cur',
+        "SELECT order_id, product_id, quantity FROM order_items",
+        ORDER_ITEMS_BATCH * FETCH_BATCHES
+    ):
+        yield 'order_items', rows
+    for rows in stream_rows(
+        pg_conn, 'events_cur',
+        "SELECT id, customer_id, product_id, event_type, ts FROM events",
+        EVENTS_BATCH * FETCH_BATCHES
+    ):
+        yield 'events', rows
+
+
+def extract_worker(pg_conn, batches):
+    """Producer thread: push extracted batches onto the queue, then None."""
+    try:
+        for item in extract_batches(pg_conn):
+            batches.put(item)
+    except Exception as e:
+        batches.put(e)
+    else:
+        batches.put(None)
+
+
+LOADERS = {
+    'categories': load_categories,
+    'products': load_products,
+    'customers': load_customers,
+    'orders': load_orders,
+}
+
+# Fact loaders also take the writer pool (or None for server-side concurrency)
+FACT_LOADERS = {
+    'order_items': load_order_items,
+    'events': load_events,
+}
+
+
+def write_import_csv(path, header, rows):
+    """Write one neo4j-admin import CSV: a typed header line, then the rows."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def export_import_csvs(pg_conn, out_dir):
+    """Dump PostgreSQL into neo4j-admin import CSVs under out_dir.
+
+    Relationship rows with a NULL foreign key are left out: neo4j-admin would
+    reject their empty :START_ID/:END_ID and abort the import, while the
+    Cypher loaders skip them because their MATCH finds nothing.
+
+    Returns (nodes, relationships) as lists of (label or type, file name);
+    a type of None means the file carries its own :TYPE column.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    categories_df = pd.read_sql("SELECT id, name FROM categories", pg_conn)
+    write_import_csv(
+        out_dir / 'categories.csv', ['id:ID(Category)', 'name'],
+        categories_df.itertuples(index=False)
+    )
+
+    products_df = pd.read_sql("SELECT id, name, price, category_id FROM products", pg_conn)
+    products_df['price'] = products_df['price'].astype('float64')
+    write_import_csv(
+        out_dir / 'products.csv', ['id:ID(Product)', 'name', 'price:double'],
+        products_df[['id', 'name', 'price']].itertuples(index=False)
+    )
+    write_import_csv(
+        out_dir / 'in_category.csv', [':START_ID(Product)', ':END_ID(Category)'],
+        products_df[['id', 'category_id']].dropna(subset=['category_id']).itertuples(index=False)
+    )
+
+    customers_df = pd.read_sql("SELECT id, name, join_date FROM customers", pg_conn)
+    customers_df['join_date'] = pd.to_datetime(customers_df['join_date']).dt.strftime('%Y-%m-%d')
+    write_import_csv(
+        out_dir / 'customers.csv', ['id:ID(Customer)', 'name', 'join_date:date'],
+        customers_df.itertuples(index=False)
+    )
+
+    orders_df = pd.read_sql("SELECT id, customer_id, ts FROM orders", pg_conn)
+    orders_df['ts'] = pd.to_datetime(orders_df['ts'], utc=True).dt.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+    write_import_csv(
+        out_dir / 'orders.csv', ['id:ID(Order)', 'ts:datetime'],
+        orders_df[['id', 'ts']].itertuples(index=False)
+    )
+    write_import_csv(
+        out_dir / 'placed.csv', [':START_ID(Customer)', ':END_ID(Order)'],
+        orders_df[['customer_id', 'id']].dropna(subset=['customer_id']).itertuples(index=False)
+    )
+
+    write_import_csv(
+        out_dir / 'contains.csv', [':START_ID(Order)', ':END_ID(Product)', 'quantity:int'],
+        ((r['order_id'], r['product_id'], r['quantity'])
+         for rows in stream_rows(
+             pg_conn, 'order_items_cur',
+             "SELECT order_id, product_id, quantity FROM order_items "
+             "WHERE order_id IS NOT NULL AND product_id IS NOT NULL"
+         )
+         for r in rows)
+    )
+    write_import_csv(
+        out_dir / 'events.csv',
+        ['event_id', ':START_ID(Customer)', ':END_ID(Product)', ':TYPE', 'ts:datetime'],
+        ((r['id'], r['customer_id'], r['product_id'],
+          EVENT_TYPE_MAP.get(r['event_type'], 'INTERACTED'), r['ts'].isoformat())
+         for rows in stream_rows(
+             pg_conn, 'events_cur',
+             "SELECT id, customer_id, product_id, event_type, ts FROM events "
+             "WHERE customer_id IS NOT NULL AND product_id IS NOT NULL"
+         )
+         for r in rows)
+    )
+
+    nodes = [
+        ('Category', 'categories.csv'),
+        ('Product', 'products.csv'),
+        ('Customer', 'customers.csv'),
+        ('Order', 'orders.csv'),
+    ]
+    relationships = [
+        ('IN_CATEGORY', 'in_category.csv'),
+        ('PLACED', 'placed.csv'),
+        ('CONTAINS', 'contains.csv'),
+        (None, 'events.csv'),
+    ]
+    return nodes, relationships
+
+
+def neo4j_admin_import_command(nodes, relationships, import_dir):
+    """Build the neo4j-admin full-import command for files under import_dir.
+
+    --overwrite-destination is needed even for a fresh install, whose empty
+    default database already exists; cold_load() checks emptiness first.
+    """
+    command = ['neo4j-admin', 'database', 'import', 'full', '--overwrite-destination']
+    command += [f"--nodes={label}={import_dir}/{name}" for label, name in nodes]
+    command += [
+        f"--relationships={rel_type}={import_dir}/{name}" if rel_type
+        else f"--relationships={import_dir}/{name}"
+        for rel_type, name in relationships
+    ]
+    return command + ['neo4j']
+
+
+def database_is_empty():
+    """Return True if the target Neo4j database has no nodes."""
+    neo4j_driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    try:
+        with neo4j_driver.session() as session:
+            return session.run("MATCH (n) RETURN n LIMIT 1").peek() is None
+    finally:
+        neo4j_driver.close()
+
+
+def cold_load(overwrite=False):
+    """
+    Initial migration into an empty Neo4j database with neo4j-admin import.
+
+    The import writes store files directly, bypassing transactions, so it is
+    much faster than the Cypher loaders but only valid for a fresh database
+    with Neo4j stopped. Incremental runs should use the default etl() path.
+    The import replaces the database's store files, so it refuses to run on a
+    database that already has nodes unless overwrite is set.
+    """
+    queries_path = Path(__file__).with_name("queries.cypher")
+
+    # Checked while Neo4j is still up, before anything is exported or stopped
+    wait_for_neo4j()
+    if not database_is_empty():
+        if not overwrite:
+            raise Exception(
+                "Neo4j database is not empty; --cold would replace it. "
+                "Pass --overwrite to do so anyway."
+            )
+        log.warning("Neo4j database is not empty; --overwrite set, replacing it")
+
+    log.info("\n=== Exporting PostgreSQL to neo4j-admin CSVs ===")
+    pg_conn = psycopg2.connect(
+        host=POSTGRES_HOST,
+        user=POSTGRES_USER,
+        password=POSTGRES_PASSWORD,
+        dbname=POSTGRES_DB
+    )
+    try:
+        nodes, relationships = export_import_csvs(pg_conn, NEO4J_IMPORT_DIR)
+    finally:
+        pg_conn.close()
+    log.info("✓ Wrote import files to %s", NEO4J_IMPORT_DIR)
+
+    if shutil.which('neo4j-admin') is None or shutil.which('neo4j') is None:
+        # Typical docker-compose setup: Neo4j runs in its own container, which
+        # sees the same files under /var/lib/neo4j/import.
+        command = neo4j_admin_import_command(nodes, relationships, '/var/lib/neo4j/import')
+        log.info("neo4j-admin is not available here; run the import from the Neo4j host:")
+        log.info("  docker compose stop neo4j")
+        log.info("  docker compose run --rm neo4j %s", ' '.join(command))
+        log.info("  docker compose start neo4j")
+        log.info("Then apply %s to create constraints and indexes.", queries_path.name)
+        return
+
+    log.info("\n=== Importing into Neo4j ===")
+    subprocess.run(['neo4j', 'stop'], check=True)
+    try:
+        subprocess.run(
+            neo4j_admin_import_command(nodes, relationships, NEO4J_IMPORT_DIR), check=True
+        )
+    finally:
+        # Bring the server back even if the import failed
+        subprocess.run(['neo4j', 'start'], check=True)
+    wait_for_neo4j()
+
+    neo4j_driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    try:
+        log.info("\n=== Setting up Neo4j schema ===")
+        create_constraints(neo4j_driver)
+        if queries_path.exists():
+            with neo4j_driver.session() as session:
+                run_cypher_file(session, queries_path)
+    finally:
+        neo4j_driver.close()
+
+    invalidate_api_cache()
+    log.info("\n=== Cold import complete ===")
+
+
+def etl(cold=False, overwrite=False):
     """
     Main ETL function that migrates data from PostgreSQL to Neo4j.
+
+    With cold=True the graph is bulk-imported with neo4j-admin instead of
+    loaded through Cypher; see cold_load(). overwrite lets that replace a
+    non-empty database.
     """
     wait_for_postgres()
+    if cold:
+        cold_load(overwrite=overwrite)
+        return
     wait_for_neo4j()
 
     queries_path = Path(__file__).with_name("queries.cypher")
 
-    print("\n=== Connecting to databases ===")
+    log.info("\n=== Connecting to databases ===")
     pg_conn = psycopg2.connect(
         host=POSTGRES_HOST,
         user=POSTGRES_USER,
@@ -105,139 +665,75 @@ def etl():
     )
     
     neo4j_driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    executor = ThreadPoolExecutor(max_workers=ETL_WRITERS) if ETL_WRITERS > 1 else None
+    writers = (neo4j_driver, executor) if executor else None
 
     try:
-        print("\n=== Setting up Neo4j schema ===")
-        if queries_path.exists():
-            run_cypher_file(neo4j_driver, queries_path)
-        else:
-            print(f"Warning: {queries_path} not found, skipping schema setup")
-
-        print("\n=== Extracting data from PostgreSQL ===")
-        
-        customers_df = pd.read_sql("SELECT * FROM customers", pg_conn)
-        categories_df = pd.read_sql("SELECT * FROM categories", pg_conn)
-        products_df = pd.read_sql("SELECT * FROM products", pg_conn)
-        orders_df = pd.read_sql("SELECT * FROM orders", pg_conn)
-        order_items_df = pd.read_sql("SELECT * FROM order_items", pg_conn)
-        events_df = pd.read_sql("SELECT * FROM events", pg_conn)
-        
-        print(f"✓ Extracted {len(customers_df)} customers")
-        print(f"✓ Extracted {len(categories_df)} categories")
-        print(f"✓ Extracted {len(products_df)} products")
-        print(f"✓ Extracted {len(orders_df)} orders")
-        print(f"✓ Extracted {len(order_items_df)} order items")
-        print(f"✓ Extracted {len(events_df)} events")
-
-        print("\n=== Loading data into Neo4j ===")
-        
-        print("Loading categories...")
-        for _, row in categories_df.iterrows():
-            query = """
-            MERGE (cat:Category {id: $id})
-            SET cat.name = $name
-            """
-            run_cypher(neo4j_driver, query, {
-                'id': row['id'],
-                'name': row['name']
-            })
-        print(f"✓ Loaded {len(categories_df)} categories")
-
-        print("Loading products...")
-        for _, row in products_df.iterrows():
-            query = """
-            MERGE (p:Product {id: $id})
-            SET p.name = $name, p.price = $price
-            WITH p
-            MATCH (cat:Category {id: $category_id})
-            MERGE (p)-[:IN_CATEGORY]->(cat)
-            """
-            run_cypher(neo4j_driver, query, {
-                'id': row['id'],
-                'name': row['name'],
-                'price': float(row['price']),
-                'category_id': row['category_id']
-            })
-        print(f"✓ Loaded {len(products_df)} products")
-
-        print("Loading customers...")
-        for _, row in customers_df.iterrows():
-            query = """
-            MERGE (c:Customer {id: $id})
-            SET c.name = $name, c.join_date = date($join_date)
-            """
-            run_cypher(neo4j_driver, query, {
-                'id': row['id'],
-                'name': row['name'],
-                'join_date': str(row['join_date'])
-            })
-        print(f"✓ Loaded {len(customers_df)} customers")
-
-        print("Loading orders...")
-        for _, row in orders_df.iterrows():
-            # Convert timestamp to ISO format!!!!!!!!!!!
-            ts_str = row['ts'].isoformat() if hasattr(row['ts'], 'isoformat') else str(row['ts'])
-            query = """
-            MERGE (o:Order {id: $id})
-            SET o.ts = datetime($ts)
-            WITH o
-            MATCH (c:Customer {id: $customer_id})
-            MERGE (c)-[:PLACED]->(o)
-            """
-            run_cypher(neo4j_driver, query, {
-                'id': row['id'],
-                'customer_id': row['customer_id'],
-                'ts': ts_str
-            })
-        print(f"✓ Loaded {len(orders_df)} orders")
-
-        print("Loading order items...")
-        for _, row in order_items_df.iterrows():
-            query = """
-            MATCH (o:Order {id: $order_id})
-            MATCH (p:Product {id: $product_id})
-            MERGE (o)-[r:CONTAINS]->(p)
-            SET r.quantity = $quantity
-            """
-            run_cypher(neo4j_driver, query, {
-                'order_id': row['order_id'],
-                'product_id': row['product_id'],
-                'quantity': int(row['quantity'])
-            })
-        print(f"✓ Loaded {len(order_items_df)} order items")
-
-        print("Loading events...")
-        event_type_map = {
-            'view': 'VIEWED',
-            'click': 'CLICKED',
-            'add_to_cart': 'ADDED_TO_CART'
-        }
-        
-        for _, row in events_df.iterrows():
-            rel_type = event_type_map.get(row['event_type'], 'INTERACTED')
-            # Convert timestamp to ISO format
-            ts_str = row['ts'].isoformat() if hasattr(row['ts'], 'isoformat') else str(row['ts'])
-            query = f"""
-            MATCH (c:Customer {{id: $customer_id}})
-            MATCH (p:Product {{id: $product_id}})
-            CREATE (c)-[r:{rel_type}]->(p)
-            SET r.ts = datetime($ts), r.event_id = $event_id
-            """
-            run_cypher(neo4j_driver, query, {
-                'customer_id': row['customer_id'],
-                'product_id': row['product_id'],
-                'ts': ts_str,
-                'event_id': row['id']
-            })
-        print(f"✓ Loaded {len(events_df)} events")
-
-        print("\n=== ETL Complete ===")
-        print("ETL done.")
+        # One session for the whole run: each statement reuses the same pooled
+        # connection instead of paying a session open/close per call.
+        with neo4j_driver.session() as session:
+            log.info("\n=== Setting up Neo4j schema ===")
+            create_constraints(neo4j_driver)
+            if queries_path.exists():
+                run_cypher_file(session, queries_path)
+            else:
+                log.warning("%s not found, skipping schema setup", queries_path)
+
+            log.info("\n=== Extracting from PostgreSQL and loading into Neo4j ===")
+
+            # Extraction runs in a producer thread so PostgreSQL reads the next
+            # batch while Neo4j writes the current one. The bounded queue keeps
+            # at most a few batches in memory. The thread is a daemon so a
+            # failed load does not leave it blocked on a full queue at exit.
+            batches = queue.Queue(maxsize=4)
+            producer = threading.Thread(
+                target=extract_worker, args=(pg_conn, batches), daemon=True
+            )
+            producer.start()
+
+            current, count = None, 0
+            for item in iter(batches.get, None):
+                if isinstance(item, Exception):
+                    raise item
+                table, batch = item
+                if table != current:
+                    if current:
+                        log.info("✓ Loaded %d %s", count, current.replace('_', ' '))
+                    log.info("Loading %s...", table.replace('_', ' '))
+                    current, count = table, 0
+                if table in FACT_LOADERS:
+                    FACT_LOADERS[table](session, batch, writers)
+                else:
+                    LOADERS[table](session, batch)
+                count += len(batch)
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug("  wrote batch of %d %s (%d so far)", len(batch), table, count)
+            if current:
+                log.info("✓ Loaded %d %s", count, current.replace('_', ' '))
+            producer.join()
+
+        invalidate_api_cache()
+
+        log.info("\n=== ETL Complete ===")
+        log.info("ETL done.")
 
     finally:
+        if executor:
+            executor.shutdown()
         pg_conn.close()
         neo4j_driver.close()
 
 
 if __name__ == "__main__":
-    etl()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Migrate data from PostgreSQL to Neo4j.")
+    parser.add_argument(
+        "--cold", action="store_true",
+        help="initial load into an empty database with neo4j-admin import"
+    )
+    parser.add_argument(
+        "--overwrite", action="store_true",
+        help="with --cold, replace the Neo4j database even if it already has data"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=LOG_LEVEL, format="%(message)s")
+    etl(cold=args.cold, overwrite=args.overwrite)
\ No newline at end of file
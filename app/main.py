@@ -1,94 +1,127 @@
 import os
+from cachetools import TTLCache
 from fastapi import FastAPI
-from neo4j import GraphDatabase
+from neo4j import AsyncGraphDatabase, AsyncResult, RoutingControl
+from neo4j.exceptions import ClientError
 
 app = FastAPI(title="E-Commerce Recommendations API")
 
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
 NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "password")
+NEO4J_DATABASE = os.getenv("NEO4J_DATABASE", "neo4j")
 
 driver = None
 
+# Read-heavy endpoints whose data only changes when the ETL runs. Keys carry
+# _cache_version so invalidate_cache() retires every entry at once.
+_cache = TTLCache(maxsize=128, ttl=60)
+_cache_version = 0
+
 @app.on_event("startup")
 async def startup_event():
     global driver
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    # Async driver so awaiting Neo4j yields the event loop to other requests
+    driver = AsyncGraphDatabase.driver(
+        NEO4J_URI,
+        auth=(NEO4J_USER, NEO4J_PASSWORD),
+        max_connection_pool_size=100,
+        connection_acquisition_timeout=30,
+        max_connection_lifetime=3600,
+    )
     print("✓ Connected to Neo4j")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     if driver:
-        driver.close()
+        await driver.close()
     print("✓ Closed Neo4j connection")
 
+async def read(query, parameters=None):
+    """Run a read query on the shared driver's pool and return its rows as dicts."""
+    # Result.data() materializes every record as a dict in one call
+    return await driver.execute_query(
+        query, parameters,
+        database_=NEO4J_DATABASE,
+        routing_=RoutingControl.READ,
+        result_transformer_=AsyncResult.data,
+    )
+
+async def cached_read(key, query, parameters=None):
+    """Like read(), but served from the TTL cache when a fresh entry exists."""
+    key = (_cache_version, *key)
+    rows = _cache.get(key)
+    if rows is None:
+        rows = await read(query, parameters)
+        _cache[key] = rows
+    return rows
+
+@app.post("/cache/invalidate")
+async def invalidate_cache():
+    """Drop cached responses, e.g. after the ETL has reloaded the graph."""
+    global _cache_version
+    _cache_version += 1
+    _cache.clear()
+    return {"ok": True, "cache_version": _cache_version}
+
 @app.get("/health")
 async def health():
     try:
-        with driver.session() as session:
-            result = session.run("RETURN 1 as health")
-            result.single()
+        await read("RETURN 1 as health")
         return {"ok": True}
     except Exception as e:
         return {"ok": False, "error": str(e)}
 
 @app.get("/customers")
 async def get_customers():
-    with driver.session() as session:
-        result = session.run("""
-            MATCH (c:Customer)
-            RETURN c.id as id, c.name as name, c.join_date as join_date
-            ORDER BY c.name
-        """)
-        customers = [dict(record) for record in result]
+    customers = await read("""
+        MATCH (c:Customer)
+        RETURN c.id as id, c.name as name, c.join_date as join_date
+        ORDER BY c.name
+    """)
     return {"customers": customers}
 
 @app.get("/products")
 async def get_products():
-    with driver.session() as session:
-        result = session.run("""
-            MATCH (p:Product)-[:IN_CATEGORY]->(cat:Category)
-            RETURN p.id as id, p.name as name, p.price as price, 
-                   cat.name as category
-            ORDER BY p.name
-        """)
-        products = [dict(record) for record in result]
+    products = await cached_read(("products",), """
+        MATCH (p:Product)-[:IN_CATEGORY]->(cat:Category)
+        RETURN p.id as id, p.name as name, p.price as price, 
+               cat.name as category
+        ORDER BY p.name
+    """)
     return {"products": products}
 
 @app.get("/recommendations/collaborative/{customer_id}")
 async def collaborative_recommendations(customer_id: str, limit: int = 5):
-    with driver.session() as session:
-        result = session.run("""
-            MATCH (c:Customer {id: $customer_id})-[:PLACED]->(o:Order)-[:CONTAINS]->(p:Product)
-            WITH c, collect(DISTINCT p) as customer_products
-            MATCH (other:Customer)-[:PLACED]->(o2:Order)-[:CONTAINS]->(p2:Product)
-            WHERE other.id <> c.id AND p2 IN customer_products
-            WITH c, customer_products, other, count(DISTINCT p2) as common_products
-            ORDER BY common_products DESC
-            LIMIT 10
-            MATCH (other)-[:PLACED]->(o3:Order)-[:CONTAINS]->(rec:Product)
-            WHERE NOT rec IN customer_products
-            WITH rec, count(DISTINCT other) as popularity
-            RETURN rec.id as product_id, rec.name as product_name, 
-                   rec.price as price, popularity
-            ORDER BY popularity DESC, rec.price ASC
-            LIMIT $limit
-        """, {"customer_id": customer_id, "limit": limit})
-        recommendations = [dict(record) for record in result]
+    # Expand outward from the customer's own products to their co-purchasers,
+    # so only orders touching those products are visited, not every order.
+    recommendations = await read("""
+        MATCH (c:Customer {id: $customer_id})-[:PLACED]->(:Order)-[:CONTAINS]->(p:Product)
+              <-[:CONTAINS]-(:Order)<-[:PLACED]-(other:Customer)
+        WHERE other.id <> c.id
+        WITH c, other, count(DISTINCT p) as common_products
+        ORDER BY common_products DESC
+        LIMIT 10
+        MATCH (other)-[:PLACED]->(:Order)-[:CONTAINS]->(rec:Product)
+        WHERE NOT EXISTS { (c)-[:PLACED]->(:Order)-[:CONTAINS]->(rec) }
+        WITH rec, count(DISTINCT other) as popularity
+        RETURN rec.id as product_id, rec.name as product_name, 
+               rec.price as price, popularity
+        ORDER BY popularity DESC, rec.price ASC
+        LIMIT $limit
+    """, {"customer_id": customer_id, "limit": limit})
     return {"customer_id": customer_id, "strategy": "collaborative_filtering", "recommendations": recommendations}
 
 @app.get("/recommendations/popular")
 async def popular_products(limit: int = 5):
-    with driver.session() as session:
-        result = session.run("""
-            MATCH (p:Product)<-[:CONTAINS]-(o:Order)
-            WITH p, count(o) as order_count
-            RETURN p.id as product_id, p.name as product_name, 
-                   p.price as price, order_count
-            ORDER BY order_count DESC, p.price ASC
-            LIMIT $limit
-        """, {"limit": limit})
-        recommendations = [dict(record) for record in result]
+    recommendations = await cached_read(("popular", limit), """
+        MATCH (p:Product)<-[:CONTAINS]-(o:Order)
+        WITH p, count(o) as order_count
+        RETURN p.id as product_id, p.name as product_name, 
+               p.price as price, order_count
+        ORDER BY order_count DESC, p.price ASC
+        LIMIT $limit
+    """, {"limit": limit})
     return {"strategy": "popular_products", "recommendations": recommendations}
 
 #----------
@@ -96,63 +129,69 @@ async def popular_products(limit: int = 5):
 @app.get("/recommendations/content/{product_id}")
 async def content_based_recommendations(product_id: str, limit: int = 5):
     """Content-based filtering: recommend products in the same category."""
-    with driver.session() as session:
-        result = session.run("""
-            MATCH (p:Product {id: $product_id})-[:IN_CATEGORY]->(cat:Category)
-            MATCH (rec:Product)-[:IN_CATEGORY]->(cat)
-            WHERE rec.id <> p.id
-            OPTIONAL MATCH (rec)<-[:CONTAINS]-(o:Order)
-            WITH rec, count(o) as popularity
-            RETURN rec.id as product_id, rec.name as product_name, 
-                   rec.price as price, popularity
-            ORDER BY popularity DESC, rec.price ASC
-            LIMIT $limit
-        """, {"product_id": product_id, "limit": limit})
-        recommendations = [dict(record) for record in result]
+    recommendations = await cached_read(("content", product_id, limit), """
+        MATCH (p:Product {id: $product_id})-[:IN_CATEGORY]->(cat:Category)
+        MATCH (rec:Product)-[:IN_CATEGORY]->(cat)
+        WHERE rec.id <> p.id
+        OPTIONAL MATCH (rec)<-[:CONTAINS]-(o:Order)
+        WITH rec, count(o) as popularity
+        RETURN rec.id as product_id, rec.name as product_name, 
+               rec.price as price, popularity
+        ORDER BY popularity DESC, rec.price ASC
+        LIMIT $limit
+    """, {"product_id": product_id, "limit": limit})
     return {"product_id": product_id, "strategy": "content_based", "recommendations": recommendations}
 
 @app.get("/recommendations/co-purchase/{product_id}")
 async def co_purchase_recommendations(product_id: str, limit: int = 5):
     """Co-occurrence based: products frequently bought together."""
-    with driver.session() as session:
-        result = session.run("""
-            MATCH (p:Product {id: $product_id})<-[:CONTAINS]-(o:Order)-[:CONTAINS]->(rec:Product)
-            WHERE rec.id <> p.id
-            WITH rec, count(o) as co_purchase_count
-            RETURN rec.id as product_id, rec.name as product_name, 
-                   rec.price as price, co_purchase_count
-            ORDER BY co_purchase_count DESC, rec.price ASC
-            LIMIT $limit
-        """, {"product_id": product_id, "limit": limit})
-        recommendations = [dict(record) for record in result]
+    recommendations = await cached_read(("co-purchase", product_id, limit), """
+        MATCH (p:Product {id: $product_id})<-[:CONTAINS]-(o:Order)-[:CONTAINS]->(rec:Product)
+        WHERE rec.id <> p.id
+        WITH rec, count(o) as co_purchase_count
+        RETURN rec.id as product_id, rec.name as product_name, 
+               rec.price as price, co_purchase_count
+        ORDER BY co_purchase_count DESC, rec.price ASC
+        LIMIT $limit
+    """, {"product_id": product_id, "limit": limit})
     return {"product_id": product_id, "strategy": "co_purchase", "recommendations": recommendations}
 
 @app.get("/analytics/customer-journey/{customer_id}")
 async def customer_journey(customer_id: str):
     """Analyze a customer's journey: views, clicks, cart additions, and purchases."""
-    with driver.session() as session:
-        result = session.run("""
-            MATCH (c:Customer {id: $customer_id})
-            OPTIONAL MATCH (c)-[v:VIEWED]->(viewed:Product)
-            OPTIONAL MATCH (c)-[cl:CLICKED]->(clicked:Product)
-            OPTIONAL MATCH (c)-[a:ADDED_TO_CART]->(added:Product)
-            OPTIONAL MATCH (c)-[:PLACED]->(o:Order)-[:CONTAINS]->(purchased:Product)
-            
-            RETURN c.name as customer_name,
-                   count(DISTINCT viewed) as views,
-                   count(DISTINCT clicked) as clicks,
-                   count(DISTINCT added) as cart_additions,
-                   count(DISTINCT purchased) as purchases
-        """, {"customer_id": customer_id})
-        journey = dict(result.single())
+    rows = await read("""
+        MATCH (c:Customer {id: $customer_id})
+        OPTIONAL MATCH (c)-[v:VIEWED]->(viewed:Product)
+        OPTIONAL MATCH (c)-[cl:CLICKED]->(clicked:Product)
+        OPTIONAL MATCH (c)-[a:ADDED_TO_CART]->(added:Product)
+        OPTIONAL MATCH (c)-[:PLACED]->(o:Order)-[:CONTAINS]->(purchased:Product)
+        
+        RETURN c.name as customer_name,
+               count(DISTINCT viewed) as views,
+               count(DISTINCT clicked) as clicks,
+               count(DISTINCT added) as cart_additions,
+               count(DISTINCT purchased) as purchases
+    """, {"customer_id": customer_id})
+    journey = rows[0]
     return {"customer_id": customer_id, "journey": journey}
 
 #------
 
 @app.get("/stats")
 async def get_stats():
-    with driver.session() as session:
-        result = session.run("""
+    # apoc.meta.stats reads the store's count metadata instead of scanning
+    # the graph; fall back to counting with MATCH when APOC is not installed.
+    try:
+        rows = await read("""
+            CALL apoc.meta.stats() YIELD labels, relCount
+            RETURN coalesce(labels.Customer, 0) as customers,
+                   coalesce(labels.Product, 0) as products,
+                   coalesce(labels.Order, 0) as orders,
+                   coalesce(labels.Category, 0) as categories,
+                   relCount as relationships
+        """)
+    except ClientError:
+        rows = await read("""
             MATCH (c:Customer) WITH count(c) as customers
             MATCH (p:Product) WITH customers, count(p) as products
             MATCH (o:Order) WITH customers, products, count(o) as orders
@@ -160,5 +199,5 @@ async def get_stats():
             MATCH ()-[r]->() WITH customers, products, orders, categories, count(r) as relationships
             RETURN customers, products, orders, categories, relationships
         """)
-        stats = dict(result.single())
+    stats = rows[0]
     return {"stats": stats}
\ No newline at end of file